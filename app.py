@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import utils
 
 st.set_page_config(
@@ -58,14 +60,32 @@ if uploaded_files:
     progress_bar = st.progress(0)
     status_text = st.empty()
 
-    summary_data = []
-    for i, file in enumerate(uploaded_files):
-        status_text.text(f"Processing {file.name}...")
-        summary_data.append(utils.process_csv_file(file))
-        progress_bar.progress((i + 1) / len(uploaded_files))
-
-    # Create DataFrame
-    df = pd.DataFrame(summary_data)
+    # Process files in parallel; pass name + bytes so workers don't share file
+    # handles, and slot results by upload index so the summary keeps upload
+    # order regardless of thread completion order
+    results = [None] * len(uploaded_files)
+    with ThreadPoolExecutor(max_workers=min(8, len(uploaded_files))) as executor:
+        futures = {
+            executor.submit(utils.process_csv_file, file.name, file.getvalue()): index
+            for index, file in enumerate(uploaded_files)
+        }
+        for i, future in enumerate(as_completed(futures)):
+            index = futures[future]
+            status_text.text(f"Processing {uploaded_files[index].name}...")
+            results[index] = future.result()
+            progress_bar.progress((i + 1) / len(uploaded_files))
+    file_names, vessel_names, total_counts, new_counts, file_dates = zip(*results)
+
+    # Create DataFrame column-wise, skipping pandas' per-record dict inference.
+    # Vessel names are low-cardinality; categorical codes make the downstream
+    # isin/unique/groupby operations integer comparisons instead of string walks
+    df = pd.DataFrame({
+        'File Name': file_names,
+        'Vessel Name': pd.Categorical(vessel_names),
+        'Total Count of Jobs': total_counts,
+        'New Job Count': new_counts,
+        'Date Extracted from File Name': file_dates
+    })
 
     # Convert date strings to datetime for filtering
     df['Date Extracted from File Name'] = pd.to_datetime(
@@ -95,16 +115,18 @@ if uploaded_files:
             max_value=max_date.date()
         )
 
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply filters with a single boolean mask to avoid intermediate copies
+    mask = np.ones(len(df), dtype=bool)
     if vessel_filter:
-        filtered_df = filtered_df[filtered_df['Vessel Name'].isin(vessel_filter)]
+        mask &= df['Vessel Name'].isin(vessel_filter).to_numpy()
     if len(date_range) == 2:
         start_date, end_date = date_range
-        filtered_df = filtered_df[
-            (filtered_df['Date Extracted from File Name'].dt.date >= start_date) &
-            (filtered_df['Date Extracted from File Name'].dt.date <= end_date)
-        ]
+        # Compare datetime64 values directly; .dt.date would box every element
+        start_ts = pd.Timestamp(start_date)
+        end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        dates = df['Date Extracted from File Name']
+        mask &= ((dates >= start_ts) & (dates < end_ts)).to_numpy()
+    filtered_df = df.loc[mask]
 
     # Summary Statistics
     st.subheader("📈 Summary Statistics")
@@ -125,45 +147,60 @@ if uploaded_files:
     ])
 
     with tab1:
-        st.plotly_chart(
-            utils.create_vessel_job_distribution_chart(filtered_df),
-            use_container_width=True
-        )
+        with st.spinner("Building chart..."):
+            st.plotly_chart(
+                utils.create_vessel_job_distribution_chart(filtered_df),
+                use_container_width=True,
+                config={'responsive': True}
+            )
 
     with tab2:
-        st.plotly_chart(
-            utils.create_jobs_timeline_chart(filtered_df),
-            use_container_width=True
-        )
+        with st.spinner("Building chart..."):
+            st.plotly_chart(
+                utils.create_jobs_timeline_chart(filtered_df),
+                use_container_width=True,
+                config={'responsive': True}
+            )
 
     with tab3:
-        st.plotly_chart(
-            utils.create_jobs_pie_chart(filtered_df),
-            use_container_width=True
-        )
+        with st.spinner("Building chart..."):
+            st.plotly_chart(
+                utils.create_jobs_pie_chart(filtered_df),
+                use_container_width=True,
+                config={'responsive': True}
+            )
 
     # Per-vessel detailed breakdown with expanders
     st.subheader("📊 Per Vessel File Breakdown")
 
-    # Format the date column to show only the date
-    filtered_df_display = filtered_df.copy()
-    filtered_df_display['Date Extracted from File Name'] = filtered_df_display['Date Extracted from File Name'].dt.strftime('%d-%m-%Y')
-
-    # Group by vessel
-    for vessel in sorted(filtered_df['Vessel Name'].unique()):
-        vessel_data = filtered_df_display[filtered_df_display['Vessel Name'] == vessel]
+    # Let the frontend format dates instead of pre-stringifying the column
+    date_column_config = {
+        'Date Extracted from File Name':
+            st.column_config.DateColumn('Date Extracted from File Name', format='DD-MM-YYYY')
+    }
 
+    # Precompute per-vessel aggregates and row groups in a single pass
+    vessel_totals = filtered_df.groupby('Vessel Name', sort=True, observed=True)[
+        ['Total Count of Jobs', 'New Job Count']
+    ].sum()
+    vessel_groups = dict(tuple(
+        filtered_df
+        .sort_values('Date Extracted from File Name', ascending=False)
+        .groupby('Vessel Name', sort=True, observed=True)
+    ))
+
+    for vessel, vessel_data in vessel_groups.items():
         # Create expander for each vessel
         with st.expander(f"🚢 {vessel} - {len(vessel_data)} files"):
             # Vessel total metrics
-            st.markdown(f"**Total Jobs: {vessel_data['Total Count of Jobs'].sum()}** | "
-                       f"**New Jobs: {vessel_data['New Job Count'].sum()}**")
+            st.markdown(f"**Total Jobs: {vessel_totals.at[vessel, 'Total Count of Jobs']}** | "
+                       f"**New Jobs: {vessel_totals.at[vessel, 'New Job Count']}**")
 
             # Individual file details
             st.dataframe(
-                vessel_data[['File Name', 'Date Extracted from File Name', 
-                           'Total Count of Jobs', 'New Job Count']]
-                .sort_values('Date Extracted from File Name', ascending=False),
+                vessel_data[['File Name', 'Date Extracted from File Name',
+                           'Total Count of Jobs', 'New Job Count']],
+                column_config=date_column_config,
                 use_container_width=True,
                 hide_index=True
             )
@@ -171,14 +208,19 @@ if uploaded_files:
     # Display full detailed results
     st.subheader("📋 Detailed Results")
     st.dataframe(
-        filtered_df_display,
+        filtered_df,
+        column_config=date_column_config,
         use_container_width=True,
         hide_index=True
     )
 
     # Download button for Excel report
     if st.button("📥 Generate Excel Report"):
-        excel_file = utils.create_excel_report(filtered_df_display)
+        # Format dates only here, once per click, rather than on every rerun
+        excel_file = utils.create_excel_report(filtered_df.assign(**{
+            'Date Extracted from File Name':
+                filtered_df['Date Extracted from File Name'].dt.strftime('%d-%m-%Y')
+        }))
         st.download_button(
             label="Download Excel Report",
             data=excel_file,
@@ -1,72 +1,130 @@
+import streamlit as st
 import pandas as pd
 import os
 import re
+import hashlib
 from io import BytesIO
-from openpyxl import load_workbook
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from openpyxl.formatting import Rule
-from openpyxl.styles.differential import DifferentialStyle
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableStyleInfo, TableColumn
+import xlsxwriter
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 
-def process_csv_file(file):
-    """Process a single CSV file and extract relevant information."""
+# Matches ddmmyyyy dates embedded in uploaded file names
+_DATE_RE = re.compile(r'\b(\d{2})(\d{2})(\d{4})\b')
+
+# Arrow scalar compared against the trimmed status column when counting new jobs
+_NEW_STATUS = pa.scalar('New', pa.string())
+
+# Excel report styles, built once and shared across every cell that uses them
+_HEADER_FILL = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+_HEADER_FONT = Font(color="FFFFFF", bold=True)
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_DATA_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+_GRAY_FILL = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
+_ORANGE_FILL = PatternFill(start_color="FFB266", end_color="FFB266", fill_type="solid")
+_THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+def _hash_dataframe(df):
+    """Stable content fingerprint for a DataFrame, used as a cache key."""
+    return hashlib.blake2b(
+        pd.util.hash_pandas_object(df, index=True).values.tobytes()
+    ).hexdigest()
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def process_csv_file(filename, data):
+    """Process a single CSV file, given its name and raw bytes.
+
+    Returns a (file name, vessel name, job count, new job count, date) tuple.
+    """
     try:
         # Extract date from filename using regex
-        filename = file.name
-        date_match = re.search(r'\b(\d{2})(\d{2})(\d{4})\b', filename)
-        formatted_date = f"{date_match.group(1)}-{date_match.group(2)}-{date_match.group(3)}" if date_match else "Unknown"
-        # Read CSV file
-        df = pd.read_csv(file)
+        date_match = _DATE_RE.search(filename)
+        formatted_date = f"{date_match[1]}-{date_match[2]}-{date_match[3]}" if date_match else "Unknown"
+        # Wrap the upload bytes zero-copy instead of re-buffering through BytesIO
+        buffer = pa.py_buffer(data)
+        # Sniff just the header to locate the columns of interest
+        header_columns = pd.read_csv(pa.BufferReader(buffer), nrows=0).columns
         # Identify the Vessel column
-        vessel_column = next((col for col in df.columns if 'vessel' in col.lower()), None)
-        vessel_name = df[vessel_column].iloc[0] if vessel_column else "Vessel column not found"
+        vessel_column = next((col for col in header_columns if 'vessel' in col.lower()), None)
         # Identify the Job Status column
-        status_column = next((col for col in df.columns if 'status' in col.lower()), None)
-        # Count total jobs
-        job_count = len(df)
-        # Count jobs with Job Status == 'New'
-        if status_column:
-            df[status_column] = df[status_column].astype(str).str.strip()
-            new_job_count = (df[status_column] == 'New').sum()
-        else:
-            new_job_count = 0
-        return {
-            'File Name': filename,
-            'Vessel Name': vessel_name,
-            'Total Count of Jobs': job_count,
-            'New Job Count': new_job_count,
-            'Date Extracted from File Name': formatted_date
-        }
+        status_column = next((col for col in header_columns if 'status' in col.lower()), None)
+        include_columns = [col for col in (vessel_column, status_column) if col]
+        vessel_index = include_columns.index(vessel_column) if vessel_column else None
+        status_index = include_columns.index(status_column) if status_column else None
+        # Stream the CSV batch-by-batch, reading only the needed columns
+        reader = pacsv.open_csv(
+            pa.BufferReader(buffer),
+            convert_options=pacsv.ConvertOptions(include_columns=include_columns)
+        )
+        job_count = 0
+        new_job_count = 0
+        vessel_name = None
+        for batch in reader:
+            # Count total jobs
+            job_count += batch.num_rows
+            if vessel_index is not None and vessel_name is None and batch.num_rows:
+                vessel_name = batch.column(vessel_index)[0].as_py()
+            # Count jobs with Job Status == 'New'
+            if status_index is not None:
+                status = pc.utf8_trim_whitespace(
+                    pc.cast(batch.column(status_index), pa.string())
+                )
+                new_job_count += pc.sum(pc.equal(status, _NEW_STATUS)).as_py() or 0
+        if vessel_name is None:
+            vessel_name = "Vessel column not found"
+        return (filename, vessel_name, job_count, new_job_count, formatted_date)
     except Exception as e:
-        return {
-            'File Name': filename if 'filename' in locals() else 'Unknown',
-            'Vessel Name': 'Error',
-            'Total Count of Jobs': 'Error',
-            'New Job Count': 'Error',
-            'Date Extracted from File Name': formatted_date if 'formatted_date' in locals() else 'Unknown'
-        }
+        return (
+            filename if 'filename' in locals() else 'Unknown',
+            'Error',
+            'Error',
+            'Error',
+            formatted_date if 'formatted_date' in locals() else 'Unknown'
+        )
 
-def create_vessel_job_distribution_chart(df):
-    """Create a bar chart showing job distribution across vessels for individual files."""
+def _build_vessel_job_distribution_chart(df):
+    """Build the bar chart showing job distribution across vessels for individual files."""
     # Sort data by date to maintain chronological order
     df = df.sort_values('Date Extracted from File Name')
-    
+
+    # Beyond a few hundred bars the per-file view is unreadable and slow to
+    # render, so fall back to one bar per vessel
+    if len(df) > 500:
+        df = df.groupby('Vessel Name', sort=True, as_index=False, observed=True)[
+            ['Total Count of Jobs', 'New Job Count']
+        ].sum()
+        x_labels = df['Vessel Name'].astype(str).to_numpy()
+    else:
+        # Build the axis labels once with vectorized string concatenation
+        x_labels = (df['Vessel Name'].astype(str) + ' - ' + df['File Name'].astype(str)).to_numpy()
+
     fig = go.Figure()
-    
+
     # Add total jobs bars
     fig.add_trace(go.Bar(
         name='Total Jobs',
-        x=[f"{row['Vessel Name']} - {row['File Name']}" for _, row in df.iterrows()],
+        x=x_labels,
         y=df['Total Count of Jobs'],
         marker_color='#1F4E78'
     ))
-    
+
     # Add new jobs bars
     fig.add_trace(go.Bar(
         name='New Jobs',
-        x=[f"{row['Vessel Name']} - {row['File Name']}" for _, row in df.iterrows()],
+        x=x_labels,
         y=df['New Job Count'],
         marker_color='#F63366'
     ))
@@ -80,31 +138,28 @@ def create_vessel_job_distribution_chart(df):
         height=500,  # Increased height for better visibility
         showlegend=True,
         xaxis=dict(
-            tickangle=45,  # Angled labels for better readability
-            tickmode='array',
-            ticktext=[f"{row['Vessel Name']}<br>{row['File Name']}" for _, row in df.iterrows()],
-            tickvals=list(range(len(df)))
+            tickangle=45  # Angled labels for better readability
         ),
         margin=dict(b=150)  # Increased bottom margin for rotated labels
     )
     
     return fig
 
-def create_jobs_timeline_chart(df):
-    """Create a line chart showing job trends over time."""
+def _build_jobs_timeline_chart(df):
+    """Build the line chart showing job trends over time."""
     timeline_data = df.groupby('Date Extracted from File Name').agg({
         'Total Count of Jobs': 'sum',
         'New Job Count': 'sum'
     }).reset_index()
     
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=timeline_data['Date Extracted from File Name'],
         y=timeline_data['Total Count of Jobs'],
         name='Total Jobs',
         line=dict(color='#1F4E78', width=2)
     ))
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=timeline_data['Date Extracted from File Name'],
         y=timeline_data['New Job Count'],
         name='New Jobs',
@@ -120,8 +175,8 @@ def create_jobs_timeline_chart(df):
     )
     return fig
 
-def create_jobs_pie_chart(df):
-    """Create a pie chart showing the proportion of new vs. existing jobs."""
+def _build_jobs_pie_chart(df):
+    """Build the pie chart showing the proportion of new vs. existing jobs."""
     total_jobs = df['Total Count of Jobs'].sum()
     new_jobs = df['New Job Count'].sum()
     existing_jobs = total_jobs - new_jobs
@@ -140,61 +195,137 @@ def create_jobs_pie_chart(df):
     )
     return fig
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_dataframe})
+def _vessel_job_distribution_json(df):
+    return _build_vessel_job_distribution_chart(df).to_json()
+
+def create_vessel_job_distribution_chart(df):
+    """Create a bar chart showing job distribution across vessels for individual files."""
+    return pio.from_json(_vessel_job_distribution_json(df))
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_dataframe})
+def _jobs_timeline_json(df):
+    return _build_jobs_timeline_chart(df).to_json()
+
+def create_jobs_timeline_chart(df):
+    """Create a line chart showing job trends over time."""
+    return pio.from_json(_jobs_timeline_json(df))
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_dataframe})
+def _jobs_pie_json(df):
+    return _build_jobs_pie_chart(df).to_json()
+
+def create_jobs_pie_chart(df):
+    """Create a pie chart showing the proportion of new vs. existing jobs."""
+    return pio.from_json(_jobs_pie_json(df))
+
 def create_excel_report(df):
     """Create a formatted Excel report from the DataFrame."""
+    # openpyxl keeps a style object per cell even in write-only mode; for large
+    # reports switch to xlsxwriter, which flushes rows as they are written
+    if len(df) > 5000:
+        return _create_excel_report_xlsxwriter(df)
+    return _create_excel_report_openpyxl(df)
+
+def _create_excel_report_xlsxwriter(df):
+    """Stream a large report through xlsxwriter in constant-memory mode.
+
+    The Excel table and zebra striping are dropped at this scale; the
+    duplicate-vessel highlight is pre-applied per cell as in the openpyxl path.
+    """
     output = BytesIO()
-    
-    # Save DataFrame to Excel
-    df.to_excel(output, index=False)
-    
-    # Load workbook for formatting
+    wb = xlsxwriter.Workbook(output, {'constant_memory': True})
+    ws = wb.add_worksheet("Sheet1")
+
+    header_format = wb.add_format({
+        'bg_color': '#1F4E78', 'font_color': 'white', 'bold': True,
+        'align': 'center', 'valign': 'vcenter', 'text_wrap': True, 'border': 1
+    })
+    data_format = wb.add_format({'align': 'center', 'valign': 'vcenter', 'border': 1})
+    duplicate_format = wb.add_format({
+        'align': 'center', 'valign': 'vcenter', 'border': 1, 'bg_color': '#FFB266'
+    })
+
+    # Column widths, measured once from the DataFrame
+    for i, col in enumerate(df.columns):
+        longest = df[col].astype(str).str.len().max()
+        max_length = max(len(str(col)), int(longest) if pd.notna(longest) else 0)
+        ws.set_column(i, i, min(60, max_length + 2))
+
+    dup_mask = df['Vessel Name'].duplicated(keep=False).to_numpy()
+    vessel_col = df.columns.get_loc('Vessel Name')
+
+    ws.write_row(0, 0, df.columns, header_format)
+    for irow, row in enumerate(df.itertuples(index=False), start=1):
+        for icol, value in enumerate(row):
+            if pd.isna(value):
+                # Write NaN/NaT as a blank styled cell, matching the openpyxl path
+                value = None
+            if icol == vessel_col and dup_mask[irow - 1]:
+                ws.write(irow, icol, value, duplicate_format)
+            else:
+                ws.write(irow, icol, value, data_format)
+
+    wb.close()
     output.seek(0)
-    wb = load_workbook(output)
-    ws = wb.active
-    
-    # Define styles
-    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    # Cell borders
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    # Format headers
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        cell.border = thin_border
-    
-    # Format data cells
-    for row in ws.iter_rows(min_row=2):
-        for cell in row:
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = thin_border
-    
-    # Define orange fill for conditional formatting (duplicates)
-    orange_fill = PatternFill(start_color="FFB266", end_color="FFB266", fill_type="solid")
-    dxf = DifferentialStyle(fill=orange_fill)
-    
-    # Create rule for duplicate values in Vessel Name column
-    dup_rule = Rule(type="duplicateValues", dxf=dxf, stopIfTrue=False)
-    ws.conditional_formatting.add(f'B2:B{ws.max_row}', dup_rule)
-    
-    # Alternating row colors
-    gray_fill = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
-    for row in range(2, ws.max_row + 1, 2):
-        for cell in ws[row]:
-            cell.fill = gray_fill
-    
-    # Add Excel table with formatting
-    table_ref = f"A1:E{ws.max_row}"
+
+    return output
+
+def _create_excel_report_openpyxl(df):
+    """Build a fully styled report with an openpyxl write-only workbook."""
+    output = BytesIO()
+
+    # Build the workbook in write-only mode: rows are streamed out as they
+    # are appended, so memory stays near-constant regardless of report size
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="Sheet1")
+
+    # Column widths must be set before any rows are appended in write-only mode;
+    # measure with the pandas string-length kernel instead of per-cell str() calls
+    for i, col in enumerate(df.columns, start=1):
+        longest = df[col].astype(str).str.len().max()
+        max_length = max(len(str(col)), int(longest) if pd.notna(longest) else 0)
+        ws.column_dimensions[get_column_letter(i)].width = min(60, max_length + 2)
+
+    # Flag duplicate vessel names up front; cheaper than a conditional-format
+    # rule that Excel re-evaluates on open
+    dup_mask = df['Vessel Name'].duplicated(keep=False).to_numpy()
+    vessel_col = df.columns.get_loc('Vessel Name')
+
+    # Header row
+    header_cells = []
+    for col in df.columns:
+        cell = WriteOnlyCell(ws, value=col)
+        cell.fill = _HEADER_FILL
+        cell.font = _HEADER_FONT
+        cell.alignment = _HEADER_ALIGNMENT
+        cell.border = _THIN_BORDER
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # Data rows with alternating row colors
+    for irow, row in enumerate(df.itertuples(index=False)):
+        cells = []
+        for icol, value in enumerate(row):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.alignment = _DATA_ALIGNMENT
+            cell.border = _THIN_BORDER
+            if icol == vessel_col and dup_mask[irow]:
+                cell.fill = _ORANGE_FILL
+            elif irow % 2 == 0:
+                cell.fill = _GRAY_FILL
+            cells.append(cell)
+        ws.append(cells)
+
+    last_row = len(df) + 1
+
+    # Add Excel table with formatting; column names must be set explicitly
+    # because write-only sheets cannot read them back from the header row
+    table_ref = f"A1:E{last_row}"
     table = Table(displayName="JobSummaryTable", ref=table_ref)
+    table.tableColumns = [
+        TableColumn(id=i, name=str(col)) for i, col in enumerate(df.columns, start=1)
+    ]
     style = TableStyleInfo(
         name="TableStyleMedium2",
         showFirstColumn=False,
@@ -204,23 +335,9 @@ def create_excel_report(df):
     )
     table.tableStyleInfo = style
     ws.add_table(table)
-    
-    # Adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column = list(column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column[0].column_letter].width = adjusted_width
-    
+
     # Save to BytesIO
-    output_formatted = BytesIO()
-    wb.save(output_formatted)
-    output_formatted.seek(0)
-    
-    return output_formatted
+    wb.save(output)
+    output.seek(0)
+
+    return output